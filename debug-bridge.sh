@@ -3,16 +3,44 @@
 # Configuration
 PORT=9222
 LOG_FILE="debug-bridge.log"
-# Get Windows IP (Route default -> awk print 3rd column)
-WSL_IP=$(ip route show | grep -i default | awk '{ print $3}')
+PID_FILE="debug-bridge.pid"
+# Get Windows IP (default route gateway, read straight from /proc/net/route)
+# Gateway is little-endian hex, e.g. 01D015AC -> 172.21.208.1
+get_host_ip() {
+    local iface dest gw rest
+    while read -r iface dest gw rest; do
+        if [ "$dest" = "00000000" ]; then
+            printf '%d.%d.%d.%d\n' "0x${gw:6:2}" "0x${gw:4:2}" "0x${gw:2:2}" "0x${gw:0:2}"
+            return
+        fi
+    done < /proc/net/route
+}
+WSL_IP=$(get_host_ip 2>/dev/null)
 
-# Helper function for logging
+# Helper function for logging (builtin %(...)T timestamp, no date/tee subprocesses)
 log() {
-    echo "$(date '+%Y-%m-%d %H:%M:%S') - $1" | tee -a "$LOG_FILE"
+    local line
+    printf -v line '%(%Y-%m-%d %H:%M:%S)T - %s' -1 "$1"
+    echo "$line"
+    echo "$line" >&3
+}
+
+# Is anything LISTENing (state 0A) on $PORT? Reads /proc/net/tcp{,6} rather than connecting,
+# since a connect to socat makes it fork a child that dials through to Chrome
+port_listening() {
+    local table hex sl local_addr rem_addr state rest
+    printf -v hex ':%04X' "$PORT"
+    for table in /proc/net/tcp /proc/net/tcp6; do
+        while read -r sl local_addr rem_addr state rest; do
+            [ "$state" = "0A" ] && [[ $local_addr == *"$hex" ]] && return 0
+        done < "$table"
+    done 2>/dev/null
+    return 1
 }
 
-# Clear previous log
+# Clear previous log, then keep it open on fd 3 for log()
 echo "--- Starting New Session ---" > "$LOG_FILE"
+exec 3>> "$LOG_FILE"
 
 # 1. Sanity Check IP
 if [ -z "$WSL_IP" ]; then
@@ -23,23 +51,62 @@ log "Windows Host IP detected as: $WSL_IP"
 
 # 2. Cleanup
 log "--- Cleaning up Port $PORT ---"
-if sudo lsof -t -i:$PORT >/dev/null; then
-    PID=$(sudo lsof -t -i:$PORT)
+# Kill the bridge we started last time directly; only scan with sudo lsof for
+# orphans, and only when /proc/net/tcp shows something is listening
+OLD_PID=""
+if [ -f "$PID_FILE" ]; then
+    read -r OLD_PID < "$PID_FILE"
+    # Make sure the PID hasn't been recycled by something else (including some other socat)
+    COMM=""
+    CMDLINE=()
+    { read -r COMM < "/proc/$OLD_PID/comm"; mapfile -d '' -t CMDLINE < "/proc/$OLD_PID/cmdline"; } 2>/dev/null
+    [ "$COMM" = "socat" ] && [[ " ${CMDLINE[*]} " == *" TCP4-LISTEN:$PORT,"* ]] || OLD_PID=""
+fi
+KILLED=""
+if [ -n "$OLD_PID" ]; then
+    log "Killing previous bridge $OLD_PID..."
+    # Forked per-connection children first, while they're still parented to the listener
+    pkill -9 -P "$OLD_PID"
+    kill -9 $OLD_PID
+    KILLED=$OLD_PID
+elif port_listening && PID=$(sudo lsof -t -i:$PORT 3>&-); then
     log "Killing process $PID..."
     sudo kill -9 $PID
+    KILLED=$PID
 else
     log "Port $PORT is clear."
 fi
 
+# kill -9 is asynchronous; wait for the process(es) to be gone before rebinding (20ms polls, 2s cap)
+# A zombie (state Z) holds no sockets, so it counts as gone
+pid_alive() {
+    local pid stat state
+    for pid in "$@"; do
+        { read -r stat < "/proc/$pid/stat"; } 2>/dev/null || continue
+        state=${stat##*) }
+        [ "${state%% *}" != "Z" ] && return 0
+    done
+    return 1
+}
+for _ in {1..100}; do
+    pid_alive $KILLED || break
+    sleep 0.02
+done
+
 # 3. Start Bridge
 log "--- Starting Bridge (Socat) ---"
-# Start socat with IPv4 force
-nohup socat TCP4-LISTEN:$PORT,fork,reuseaddr TCP:$WSL_IP:$PORT >> "$LOG_FILE" 2>&1 &
+# Start socat with IPv4 force; nodelay on both legs so small CDP frames aren't held back by Nagle
+nohup socat TCP4-LISTEN:$PORT,fork,reuseaddr,nodelay TCP:$WSL_IP:$PORT,nodelay >> "$LOG_FILE" 2>&1 3>&- &
 SOCAT_PID=$!
+echo "$SOCAT_PID" > "$PID_FILE"
 log "Bridge started with PID $SOCAT_PID"
 
-# Wait for bind
-sleep 1
+# Wait for bind (poll every 10ms, give up after 1s or if socat died)
+for _ in {1..100}; do
+    port_listening && break
+    kill -0 $SOCAT_PID 2>/dev/null || break
+    sleep 0.01
+done
 
 # 4. Hard Verification (The Fix)
 log "--- Verification Test (Hard 5s Limit) ---"
@@ -47,11 +114,12 @@ log "--- Verification Test (Hard 5s Limit) ---"
 # We use the 'timeout' utility to kill curl if it takes > 5 seconds
 # timeout 5s: The OS kills the command after 5s
 # curl -v: Verbose output (captured to log) to see WHERE it hangs
-if timeout 5s curl -v http://127.0.0.1:$PORT/json/version >> "$LOG_FILE" 2>&1; then
+if VERSION_JSON=$(timeout 5s curl -v http://127.0.0.1:$PORT/json/version 2>> "$LOG_FILE"); then
+    echo "$VERSION_JSON" >> "$LOG_FILE"
     log "✅ SUCCESS! Connection established."
     echo ""
-    # Print the JSON to console for confirmation
-    curl -s --max-time 2 http://127.0.0.1:$PORT/json/version | head -n 5
+    # Print the JSON from the same request to console for confirmation
+    echo "$VERSION_JSON" | head -n 5
     exit 0
 else
     EXIT_CODE=$?
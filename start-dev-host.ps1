@@ -7,31 +7,93 @@ $UserDataDir = "C:\ChromeDevProfile"
 $Port = 9222
 
 Write-Host "--- [1/4] Detecting WSL Network ---" -ForegroundColor Cyan
-$WslAdapter = Get-NetIPAddress -InterfaceAlias "*WSL*" -AddressFamily IPv4 -ErrorAction SilentlyContinue
-if (-not $WslAdapter) {
+# NetworkInterface calls GetAdaptersAddresses directly; Get-NetIPAddress goes through CIM and is much slower
+$WslHostIP = [System.Net.NetworkInformation.NetworkInterface]::GetAllNetworkInterfaces() |
+    Where-Object { $_.Name -like "*WSL*" } |
+    ForEach-Object { $_.GetIPProperties().UnicastAddresses.Address } |
+    Where-Object { $_.AddressFamily -eq "InterNetwork" } |
+    Select-Object -First 1 -ExpandProperty IPAddressToString
+if (-not $WslHostIP) {
+    $WslHostIP = Get-NetIPAddress -InterfaceAlias "*WSL*" -AddressFamily IPv4 -ErrorAction SilentlyContinue |
+        Select-Object -First 1 -ExpandProperty IPAddress
+}
+if (-not $WslHostIP) {
     Write-Host "X CRITICAL: No WSL adapter found. Is WSL running?" -ForegroundColor Red
     exit 1
 }
-$WslHostIP = $WslAdapter.IPAddress
 Write-Host "OK WSL Host IP: $WslHostIP" -ForegroundColor Green
 
+# Rules are stored as "listenaddr/port" = "connectaddr/port". Only (re)writing the rule needs
+# elevation, so check both before killing Chrome rather than failing halfway through
+$ProxyKey = "HKLM:\SYSTEM\CurrentControlSet\Services\PortProxy\v4tov4\tcp"
+$Rule = (Get-ItemProperty -Path $ProxyKey -ErrorAction SilentlyContinue)."$WslHostIP/$Port"
+# The registry value survives reboots and wsl --shutdown, but iphlpsvc may have bound before the
+# WSL adapter existed; only trust the rule if something is actually listening on it (no CIM)
+$Listener = [System.Net.NetworkInformation.IPGlobalProperties]::GetIPGlobalProperties().GetActiveTcpListeners() |
+    Where-Object { $_.Address.ToString() -eq $WslHostIP -and $_.Port -eq $Port }
+$RuleOk = ($Rule -eq "127.0.0.1/$Port") -and [bool]$Listener
+# Non-admin reruns are only allowed when the rule is both registered and live; a stale listener
+# needs a delete + re-add, which needs elevation just like first-time setup
+if (-not $RuleOk) {
+    $IsAdmin = ([Security.Principal.WindowsPrincipal][Security.Principal.WindowsIdentity]::GetCurrent()).IsInRole([Security.Principal.WindowsBuiltInRole]::Administrator)
+    if (-not $IsAdmin) {
+        Write-Host "X CRITICAL: PortProxy rule is missing or not listening and this shell is not elevated. Run as Administrator." -ForegroundColor Red
+        exit 1
+    }
+}
+
 Write-Host "`n--- [2/4] Nuking Chrome & Clearing Profile ---" -ForegroundColor Cyan
-Stop-Process -Name chrome -Force -ErrorAction SilentlyContinue
-Start-Sleep -Seconds 2
-Remove-Item $UserDataDir -Recurse -Force -ErrorAction SilentlyContinue
+# Wait on the killed processes themselves instead of a blind sleep; returns as soon as they've exited
+$Chrome = Get-Process -Name chrome -ErrorAction SilentlyContinue
+if ($Chrome) {
+    $Chrome | Stop-Process -Force -ErrorAction SilentlyContinue
+    $Chrome | Wait-Process -Timeout 5 -ErrorAction SilentlyContinue
+}
+# Move the profile aside (a rename, instant) and delete it in the background so launch isn't
+# blocked on thousands of cache files; fall back to a blocking delete if the move fails
+if (Test-Path $UserDataDir) {
+    Move-Item $UserDataDir "$UserDataDir.old.$PID" -ErrorAction SilentlyContinue
+    if (Test-Path $UserDataDir) {
+        Remove-Item $UserDataDir -Recurse -Force -ErrorAction SilentlyContinue
+    }
+}
+# Sweep every tombstone, including ones left behind by an interrupted or failed earlier delete
+if (Test-Path "$UserDataDir.old.*") {
+    Start-Process cmd.exe -ArgumentList "/c for /d %d in (`"$UserDataDir.old.*`") do rmdir /s /q `"%d`"" -WindowStyle Hidden
+}
 Write-Host "OK Chrome killed, profile cleared" -ForegroundColor Green
 
 Write-Host "`n--- [3/4] Setting up PortProxy ---" -ForegroundColor Cyan
-netsh interface portproxy delete v4tov4 listenaddress=$WslHostIP listenport=$Port 2>$null | Out-Null
-netsh interface portproxy add v4tov4 listenaddress=$WslHostIP listenport=$Port connectaddress=127.0.0.1 connectport=$Port | Out-Null
+# Skip netsh entirely if our rule already exists and is live (checked in step 1); otherwise
+# delete + re-add, which also re-binds a listener that went stale across a reboot
+if (-not $RuleOk) {
+    # One netsh process for both commands (fed on stdin); delete just errors if there's no old rule
+    "interface portproxy delete v4tov4 listenaddress=$WslHostIP listenport=$Port",
+    "interface portproxy add v4tov4 listenaddress=$WslHostIP listenport=$Port connectaddress=127.0.0.1 connectport=$Port" |
+        netsh > $null 2>&1
+    # netsh's output is discarded, so confirm the add actually landed in the registry
+    $Rule = (Get-ItemProperty -Path $ProxyKey -ErrorAction SilentlyContinue)."$WslHostIP/$Port"
+    if ($Rule -ne "127.0.0.1/$Port") {
+        Write-Host "X CRITICAL: PortProxy rule was not added. Check: netsh interface portproxy show all" -ForegroundColor Red
+        exit 1
+    }
+}
 Write-Host "OK PortProxy: ${WslHostIP}:${Port} -> 127.0.0.1:${Port}" -ForegroundColor Green
 
 Write-Host "`n--- [4/4] Launching Chrome ---" -ForegroundColor Cyan
 Start-Process $ChromePath -ArgumentList "--remote-debugging-port=$Port","--user-data-dir=$UserDataDir","--no-first-run","about:blank"
-Start-Sleep -Seconds 3
 
-$test = curl.exe -s "http://127.0.0.1:$Port/json/version" 2>$null
-if ($test -match "Browser") {
+# Poll DevTools with jittered exponential backoff (50ms doubling, capped at 2s, 10s budget)
+$Deadline = (Get-Date).AddSeconds(10)
+$Delay = 0.05
+$Listening = $false
+while ((Get-Date) -lt $Deadline) {
+    $test = curl.exe -s --max-time 1 "http://127.0.0.1:$Port/json/version" 2>$null
+    if ($test -match "Browser") { $Listening = $true; break }
+    Start-Sleep -Milliseconds ([int](1000 * $Delay * (0.5 + (Get-Random -Maximum 0.5))))
+    $Delay = [Math]::Min($Delay * 2, 2.0)
+}
+if ($Listening) {
     Write-Host "OK Chrome DevTools listening!" -ForegroundColor Green
 } else {
     Write-Host "X Chrome not responding" -ForegroundColor Red